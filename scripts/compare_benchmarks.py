@@ -1,26 +1,114 @@
-import json
 import sys
 import os
+from bisect import bisect_right
+from collections import namedtuple
+from itertools import chain
 
-def load_json(filepath):
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Only the fields the report needs are kept from each BenchmarkDotNet entry.
+Bench = namedtuple('Bench', 'key mean alloc')
+
+# Shared default for missing or null sections (BenchmarkDotNet writes null
+# for benchmarks that failed), so lookups don't build a new dict each time.
+_EMPTY = {}
+
+def get_benchmark_key(bm):
+    # Create a unique key for the benchmark based on its name and parameters
+    return bm.get('FullName', bm.get('DisplayInfo', 'Unknown'))
+
+def mean_of(bm):
+    return (bm.get('Statistics') or _EMPTY).get('Mean', 0)
+
+def alloc_of(bm):
+    return (bm.get('Memory') or _EMPTY).get('BytesAllocatedPerOperation', 0)
+
+def to_bench(bm):
+    return Bench(get_benchmark_key(bm), mean_of(bm), alloc_of(bm))
+
+BENCHMARKS_SHAPE_ERROR = "expected a JSON object with a 'Benchmarks' array"
+
+def benchmarks_section(report):
+    benchmarks = report.get('Benchmarks') if isinstance(report, dict) else None
+    if not isinstance(benchmarks, list):
+        raise ValueError(BENCHMARKS_SHAPE_ERROR)
+    return benchmarks
+
+def check_streamed_report(f):
+    # Streaming counterpart of benchmarks_section, only run when ijson found
+    # no entries: stop as soon as the top level and the Benchmarks value are
+    # known, and fail unless they are an object and an array.
+    f.seek(0)
+    events = ijson.parse(f)
+    first_event = next(events, None)
+    if first_event is None or first_event[1] != 'start_map':
+        raise ValueError(BENCHMARKS_SHAPE_ERROR)
+    for prefix, event, _ in events:
+        if prefix == 'Benchmarks':
+            if event != 'start_array':
+                raise ValueError(BENCHMARKS_SHAPE_ERROR)
+            return
+    raise ValueError(BENCHMARKS_SHAPE_ERROR)
+
+def iter_raw_benchmarks(f):
+    # Stream entries one at a time when ijson is available so peak memory
+    # does not grow with the size of the report.
+    if ijson is not None:
+        benchmarks = ijson.items(f, 'Benchmarks.item', use_float=True)
+        found_any = False
+        for bm in benchmarks:
+            found_any = True
+            yield bm
+        # Entries only come from a top-level object's Benchmarks array, so
+        # the shape needs checking only when nothing was yielded.
+        if not found_any:
+            check_streamed_report(f)
+        return
+    yield from benchmarks_section(_loads(f.read()))
+
+def load_benchmarks(filepath):
     try:
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        with open(filepath, 'rb') as f:
+            return [to_bench(bm) for bm in iter_raw_benchmarks(f)]
     except Exception as e:
         print(f"Error loading {filepath}: {e}", file=sys.stderr)
         return None
 
-def get_benchmark_key(bm):
-    # Create a unique key for the benchmark based on its name and parameters
-    return bm.get('FullName', bm.get('DisplayInfo', 'Unknown'))
+# Upper bound (exclusive, in ns) for each display unit; anything above the
+# last bound is shown in seconds.
+TIME_UNIT_LIMITS_NS = (1e3, 1e6, 1e9)
+TIME_UNITS = (
+    (1, "{:.2f} ns".format),
+    (1e3, "{:.2f} us".format),
+    (1e6, "{:.2f} ms".format),
+    (1e9, "{:.2f} s".format),
+)
+
+# Mean changes beyond this many percent are flagged in the report
+SIGNIFICANT_DIFF_PERCENT = 5.0
+# Indexed by classify_diff: unchanged, regression, improvement
+DIFF_MARKERS = ("", " 🔴", " 🟢")
+
+_format_diff = "{:.2f}%{}".format
 
 def format_time(ns):
-    if ns < 1000:
-        return f"{ns:.2f} ns"
-    elif ns < 1000000:
-        return f"{ns/1000:.2f} us"
-    else:
-        return f"{ns/1000000:.2f} ms"
+    divisor, format_value = TIME_UNITS[bisect_right(TIME_UNIT_LIMITS_NS, ns)]
+    return format_value(ns / divisor)
+
+def shorten_name(name):
+    # Keep only the last dotted component (rpartition returns the whole
+    # name when there is no dot)
+    return name.rpartition('.')[2]
 
 def calculate_diff(current, baseline):
     if baseline == 0:
@@ -28,66 +116,74 @@ def calculate_diff(current, baseline):
     diff = (current - baseline) / baseline * 100
     return diff
 
-def main():
-    if len(sys.argv) < 3:
-        print("Usage: python3 compare_benchmarks.py <baseline_json> <current_json>")
-        sys.exit(1)
-
-    baseline_path = sys.argv[1]
-    current_path = sys.argv[2]
-
-    baseline_data = load_json(baseline_path)
-    current_data = load_json(current_path)
-
-    if not baseline_data or not current_data:
-        print("Failed to load benchmark data.")
-        sys.exit(1)
-
-    baseline_map = {get_benchmark_key(bm): bm for bm in baseline_data.get('Benchmarks', [])}
-    current_benchmarks = current_data.get('Benchmarks', [])
-
-    print("# Benchmark Comparison Report\n")
-    print(f"**Baseline:** {os.path.basename(baseline_path)}")
-    print(f"**Current:** {os.path.basename(current_path)}\n")
-
-    print("| Benchmark | Mean (Current) | Mean (Baseline) | Diff % | Alloc (Current) | Alloc (Baseline) |")
-    print("|---|---|---|---|---|---|")
+def classify_diff(diff_percent):
+    if diff_percent > SIGNIFICANT_DIFF_PERCENT:
+        return 1
+    if diff_percent < -SIGNIFICANT_DIFF_PERCENT:
+        return 2
+    return 0
 
+def format_rows(current_benchmarks, baseline_map):
     for current_bm in current_benchmarks:
-        key = get_benchmark_key(current_bm)
+        key = current_bm.key
         baseline_bm = baseline_map.get(key)
 
-        current_mean = current_bm.get('Statistics', {}).get('Mean', 0)
-        current_alloc = current_bm.get('Memory', {}).get('BytesAllocatedPerOperation', 0)
+        current_mean = current_bm.mean
+        current_alloc = current_bm.alloc
 
-        name = current_bm.get('Method', key)
-        # Simplify name if it's too long, maybe strip namespace
-        if '.' in name and '(' in name:
-             # Try to keep just the method and params
-             pass
-
-        # Display simplified name
-        display_name = key.split('.')[-1]
+        display_name = shorten_name(key)
 
         if baseline_bm:
-            baseline_mean = baseline_bm.get('Statistics', {}).get('Mean', 0)
-            baseline_alloc = baseline_bm.get('Memory', {}).get('BytesAllocatedPerOperation', 0)
+            baseline_mean = baseline_bm.mean
+            baseline_alloc = baseline_bm.alloc
 
             time_diff = calculate_diff(current_mean, baseline_mean)
 
-            # Formatting
-            time_diff_str = f"{time_diff:.2f}%" if isinstance(time_diff, float) else time_diff
-
-            # Add emoji for regression/improvement
+            # Formatting, with an emoji for regression/improvement
             if isinstance(time_diff, float):
-                if time_diff > 5.0:
-                    time_diff_str += " 🔴" # Regression
-                elif time_diff < -5.0:
-                    time_diff_str += " 🟢" # Improvement
+                time_diff_str = _format_diff(time_diff, DIFF_MARKERS[classify_diff(time_diff)])
+            else:
+                time_diff_str = time_diff
 
-            print(f"| {display_name} | {format_time(current_mean)} | {format_time(baseline_mean)} | {time_diff_str} | {current_alloc} B | {baseline_alloc} B |")
+            yield f"| {display_name} | {format_time(current_mean)} | {format_time(baseline_mean)} | {time_diff_str} | {current_alloc} B | {baseline_alloc} B |"
         else:
-            print(f"| {display_name} | {format_time(current_mean)} | N/A | New | {current_alloc} B | N/A |")
+            yield f"| {display_name} | {format_time(current_mean)} | N/A | New | {current_alloc} B | N/A |"
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python3 compare_benchmarks.py <baseline_json> <current_json>")
+        sys.exit(1)
+
+    baseline_path = sys.argv[1]
+    current_path = sys.argv[2]
+
+    baseline_benchmarks = load_benchmarks(baseline_path)
+    current_benchmarks = load_benchmarks(current_path)
+
+    if baseline_benchmarks is None or current_benchmarks is None:
+        print("Failed to load benchmark data.")
+        sys.exit(1)
+
+    baseline_map = {bm.key: bm for bm in baseline_benchmarks}
+    del baseline_benchmarks
+
+    header = (
+        "# Benchmark Comparison Report",
+        "",
+        f"**Baseline:** {os.path.basename(baseline_path)}",
+        f"**Current:** {os.path.basename(current_path)}",
+        "",
+        "| Benchmark | Mean (Current) | Mean (Baseline) | Diff % | Alloc (Current) | Alloc (Baseline) |",
+        "|---|---|---|---|---|---|",
+    )
+
+    # join collects the rows into a list internally, just as appending would;
+    # the generator only keeps row formatting separate from output. The
+    # report is emitted with a single binary write, bypassing the text layer's
+    # newline translation and locale-dependent encoding
+    rows = format_rows(current_benchmarks, baseline_map)
+    report = "\n".join(chain(header, rows, ("",)))
+    sys.stdout.buffer.write(report.encode('utf-8'))
 
 if __name__ == "__main__":
     main()
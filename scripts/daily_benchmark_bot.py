@@ -1,4 +1,5 @@
 import os
+import stat
 import subprocess
 import sys
 
@@ -6,6 +7,13 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 REPO_ROOT = os.path.dirname(SCRIPT_DIR)
 LAST_RUN_FILE = os.path.join(SCRIPT_DIR, "last_run_commit")
 BENCHMARK_SCRIPT = os.path.join(SCRIPT_DIR, "run-daily-benchmarks.sh")
+EXECUTABLE_BITS = stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
+
+def print_command_error(command, stdout, stderr):
+    print(f"Error running command: {' '.join(command)}")
+    if stdout is not None:
+        print(f"Stdout: {stdout}")
+    print(f"Stderr: {stderr}")
 
 def run_command(command, cwd=None):
     try:
@@ -19,41 +27,61 @@ def run_command(command, cwd=None):
         )
         return result.stdout.strip()
     except subprocess.CalledProcessError as e:
-        print(f"Error running command: {' '.join(command)}")
-        print(f"Stdout: {e.stdout}")
-        print(f"Stderr: {e.stderr}")
+        print_command_error(command, e.stdout, e.stderr)
         raise
 
+def run_status(command, cwd=None):
+    # For commands whose exit status is the answer: stdout is discarded and
+    # a non-zero exit does not raise. Returns the CompletedProcess so callers
+    # can inspect returncode and report stderr.
+    return subprocess.run(
+        command,
+        cwd=cwd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+
 def get_current_commit():
     return run_command(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT)
 
 def get_last_run_commit():
-    if os.path.exists(LAST_RUN_FILE):
+    try:
         with open(LAST_RUN_FILE, "r") as f:
             return f.read().strip()
-    return None
+    except FileNotFoundError:
+        return None
 
 def check_for_changes(last_commit, current_commit):
     # Check for changes between last_commit and current_commit
     # excluding the scripts/ directory
+    # --quiet reports the result through the exit code only:
+    # 0 = no changes, 1 = changes, anything else = git error.
     cmd = [
-        "git", "diff", "--name-only",
+        "git", "diff", "--quiet",
         last_commit, current_commit,
         "--", ".", ":!scripts/"
     ]
-    try:
-        output = run_command(cmd, cwd=REPO_ROOT)
-        return len(output) > 0
-    except subprocess.CalledProcessError:
-        # If the commit doesn't exist (e.g. forced push or shallow clone issue),
-        # assume changes.
-        print(f"Warning: Could not diff against {last_commit}. Assuming changes.")
+    result = run_status(cmd, cwd=REPO_ROOT)
+    if result.returncode == 0:
+        return False
+    if result.returncode == 1:
         return True
+    # If the commit doesn't exist (e.g. forced push or shallow clone issue),
+    # assume changes.
+    print_command_error(cmd, None, result.stderr)
+    print(f"Warning: Could not diff against {last_commit}. Assuming changes.")
+    return True
+
+def make_executable(path):
+    mode = os.stat(path).st_mode
+    if mode & EXECUTABLE_BITS != EXECUTABLE_BITS:
+        os.chmod(path, mode | EXECUTABLE_BITS)
 
 def run_benchmarks():
     print("Running benchmarks...")
     # Ensure the script is executable
-    subprocess.run(["chmod", "+x", BENCHMARK_SCRIPT], check=True)
+    make_executable(BENCHMARK_SCRIPT)
 
     # Run the bash script
     # pass through arguments if needed, but for now just run it